@@ -1,12 +1,23 @@
 import json
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 from huffman import HuffmanTree
 
+def _int_keys(freq_str: dict[str, int]) -> dict[int, int]:
+    return {int(key): count for key, count in freq_str.items() if count > 0}
+
 def load_frequencies(filename: str) -> dict[int, int]:
-    with open(filename, "r", encoding="utf-8") as f:
-        freq_str = json.load(f)
+    if orjson is not None:
+        with open(filename, "rb") as f:
+            return _int_keys(orjson.loads(f.read()))
 
-    return {int(key): freq_str[key] for key in freq_str if freq_str[key] > 0}
+    # object_hook wandelt die Keys direkt beim Parsen um, ohne Zwischen-Dictionary
+    with open(filename, "r", encoding="utf-8") as f:
+        return json.load(f, object_hook=_int_keys)
 
 if __name__ == '__main__':
     freq_1 = load_frequencies("frequencies.json")
@@ -1,6 +1,134 @@
 import heapq
+import io
+import os
 import struct
-from typing import Dict, Tuple, Optional
+import sys
+from array import array
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import BinaryIO, Dict, List, Tuple, Optional, Union
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+# Gültige Bits für decode, zugleich Umrechnung in 0 (links) und 1 (rechts)
+_BIT_VALUES = {'0': 0, '1': 1}
+
+# Anzahl Bits, die der Tabellen-Decoder auf einmal nachschlägt (Tabelle mit 2^11 Einträgen)
+_DECODE_TABLE_BITS = 11
+
+# Unterhalb dieser Größe setzt encode_bytes die Bitstrings aus der Code-Tabelle schneller zusammen als der JIT-Encoder
+_JIT_MIN_SIZE = 2 << 10
+
+# Unterhalb dieser Größe zählt collections.Counter schneller als np.bincount
+_NUMPY_MIN_SIZE = 1 << 10
+
+# Blockgröße beim Lesen von Dateien in compress_file/decompress_file
+_CHUNK_SIZE = 1 << 20
+
+# Ab dieser Größe encodiert compress mit Numba parallel in mehreren Threads
+_PARALLEL_MIN_SIZE = 4 << 20
+
+# Maximale Codelänge beim Aufbau des Baums (wie bei DEFLATE)
+_MAX_CODE_LEN = 15
+
+# Längster Code, den der JIT-Encoder in seinem 64-Bit-Puffer verarbeiten kann
+_JIT_MAX_CODE_LEN = 56
+
+
+if njit is not None:
+    @njit(cache=True, nogil=True)
+    def _count_bits(data, code_len):
+        """JIT-Kernel: Summe der Codelängen aller Bytes, d.h. Länge der codierten Daten in Bits."""
+        total = 0
+        for byte_value in data:
+            total += code_len[byte_value]
+        return total
+
+    @njit(cache=True, boundscheck=False, nogil=True)
+    def _encode_loop(data, code_bits, code_len, out, buf, nbits):
+        """
+        JIT-Kernel des Encoders: schreibt die Codes aller Bytes gepackt nach out.
+
+        buf und nbits enthalten die noch nicht geschriebenen Bits des vorigen Aufrufs.
+
+        Returns:
+            Tupel (geschriebene_bytes, buf, nbits) mit den verbleibenden Bits (nbits < 8)
+        """
+        pos = 0
+        for byte_value in data:
+            buf = (buf << code_len[byte_value]) | code_bits[byte_value]
+            nbits += code_len[byte_value]
+            while nbits >= 8:
+                nbits -= 8
+                out[pos] = (buf >> nbits) & 0xFF
+                pos += 1
+            buf &= (1 << nbits) - 1
+
+        return pos, buf, nbits
+
+    @njit(cache=True, boundscheck=False)
+    def _decode_loop(data, start, end, k, sym_table, len_table, node_sym, node_left, node_right, root, out):
+        """
+        JIT-Kernel des Tabellen-Decoders (siehe HuffmanTree._decode_bits).
+
+        data muss hinter den gültigen Bits mit mindestens 8 Null-Bytes aufgefüllt sein.
+
+        Returns:
+            Tupel (anzahl_decodierter_bytes, bitposition_hinter_dem_letzten_code)
+        """
+        mask = (1 << k) - 1
+        pos = start >> 3
+        buf = 0
+        # Bits vor start im ersten Byte werden mitgeladen und gleich verworfen
+        nbuf = -(start & 7)
+        count = 0
+        bitpos = start
+
+        while bitpos < end:
+            while nbuf < k:
+                buf = (buf << 8) | data[pos]
+                pos += 1
+                nbuf += 8
+
+            index = (buf >> (nbuf - k)) & mask
+            length = len_table[index]
+            if length:
+                if bitpos + length > end:
+                    break
+                out[count] = sym_table[index]
+                count += 1
+                nbuf -= length
+                bitpos += length
+                buf &= (1 << nbuf) - 1
+                continue
+
+            # Code länger als k Bits: bitweise durch den Baum
+            node = root
+            used = 0
+            while bitpos + used < end and node_sym[node] < 0:
+                if not nbuf:
+                    buf = data[pos]
+                    pos += 1
+                    nbuf = 8
+                nbuf -= 1
+                used += 1
+                node = node_right[node] if (buf >> nbuf) & 1 else node_left[node]
+            if node_sym[node] < 0:
+                break
+            out[count] = node_sym[node]
+            count += 1
+            bitpos += used
+            buf &= (1 << nbuf) - 1
+
+        return count, bitpos
 
 
 class Node:
@@ -16,18 +144,90 @@ class Node:
         """Prüft, ob dieser Knoten ein Blatt ist."""
         return self.left is None and self.right is None
 
-    def __lt__(self, other: 'Node') -> bool:
-        """Vergleichsoperator für Priority Queue."""
-        return self.freq < other.freq
+
+class BitReader:
+    """Liest Bitfelder (höchstwertiges Bit zuerst) aus Byte-Daten."""
+
+    def __init__(self, data: bytes):
+        self.data = data
+        self.bitpos = 0
+
+    def read(self, n: int) -> int:
+        """
+        Liest die nächsten n Bits als Ganzzahl.
+
+        Raises:
+            ValueError: Wenn weniger als n Bits übrig sind
+        """
+        start = self.bitpos >> 3
+        end = (self.bitpos + n + 7) >> 3
+        if end > len(self.data):
+            raise ValueError("Unerwartetes Ende der Bit-Daten")
+
+        chunk = int.from_bytes(self.data[start:end], 'big')
+        shift = end * 8 - self.bitpos - n
+        self.bitpos += n
+        return (chunk >> shift) & ((1 << n) - 1)
 
 
 class HuffmanTree:
     """Huffman-Baum mit Encoding- und Decoding-Funktionalität für Bytes."""
 
     def __init__(self):
-        self.root: Optional[Node] = None
-        self.code_table: Dict[int, str] = {}
-        self.current_node: Optional[Node] = None
+        self._reset_nodes()
+        self._code_table: Optional[Dict[int, str]] = None
+        self._code_strings: Optional[List[Optional[str]]] = None
+        self.code_bits: List[int] = [0] * 256
+        self.code_len: List[int] = [0] * 256
+        self._decode_table: Optional[Tuple[int, array, array]] = None
+
+    def _reset_nodes(self) -> None:
+        """
+        Leert den Baum.
+
+        Die Knoten liegen nicht als Node-Objekte, sondern in parallelen Arrays,
+        indiziert mit der Knoten-ID. -1 steht für "kein Kind" bzw. "kein Byte-Wert"
+        (innerer Knoten).
+        """
+        self.node_freq = array('q')
+        self.node_sym = array('h')
+        self.node_left = array('i')
+        self.node_right = array('i')
+        self.root_id = -1
+        self.current_id = -1
+        self._root_view: Optional[Node] = None
+
+    def _alloc_node(self, freq: int, sym: int = -1, left: int = -1, right: int = -1) -> int:
+        """Legt einen Knoten in den Knoten-Arrays an und gibt seine ID zurück."""
+        self.node_freq.append(freq)
+        self.node_sym.append(sym)
+        self.node_left.append(left)
+        self.node_right.append(right)
+        return len(self.node_sym) - 1
+
+    @property
+    def root(self) -> Optional[Node]:
+        """
+        Wurzel des Baums als verkettete Node-Objekte, z.B. für die Visualisierung.
+
+        Wird bei Bedarf aus den Knoten-Arrays erzeugt.
+        """
+        if self.root_id < 0:
+            return None
+
+        if self._root_view is None:
+            nodes = [
+                Node(freq, sym if sym >= 0 else None)
+                for freq, sym in zip(self.node_freq, self.node_sym)
+            ]
+            for node, left, right in zip(nodes, self.node_left, self.node_right):
+                if left >= 0:
+                    node.left = nodes[left]
+                if right >= 0:
+                    node.right = nodes[right]
+            self._root_view = nodes[self.root_id]
+
+        return self._root_view
 
     def build_from_frequencies(self, freq_dict: Dict[int, int]) -> None:
         """
@@ -39,30 +239,36 @@ class HuffmanTree:
         if not freq_dict:
             raise ValueError("Häufigkeiten-Dictionary darf nicht leer sein")
 
-        if len(freq_dict) == 1:
-            byte_value = list(freq_dict.keys())[0]
-            freq = freq_dict[byte_value]
-            self.root = Node(freq, byte_value)
-            self.code_table = {byte_value: "0"}
-            self.current_node = self.root
-            return
+        self._reset_nodes()
 
-        priority_queue = [Node(freq, byte_value) for byte_value, freq in freq_dict.items()]
+        # (Häufigkeit, Knoten-ID): Tupel werden in C verglichen, bei gleicher
+        # Häufigkeit entscheidet die eindeutige, aufsteigend vergebene ID.
+        # Blätter werden nach Byte-Wert angelegt, damit die Codelängen nur von
+        # den Häufigkeiten abhängen und nicht von der Reihenfolge im Dictionary
+        priority_queue = [
+            (freq, self._alloc_node(freq, byte_value)) for byte_value, freq in sorted(freq_dict.items())
+        ]
         heapq.heapify(priority_queue)
 
         while len(priority_queue) > 1:
-            left = heapq.heappop(priority_queue)
-            right = heapq.heappop(priority_queue)
-            if right.freq < left.freq:
-                left, right = right, left
+            left_freq, left = heapq.heappop(priority_queue)
+            right_freq, right = priority_queue[0]
 
-            parent = Node(left.freq + right.freq, left=left, right=right)
-            heapq.heappush(priority_queue, parent)
+            # Rechtes Kind entnehmen und Elternknoten einfügen in einem Schritt
+            parent = self._alloc_node(left_freq + right_freq, left=left, right=right)
+            heapq.heapreplace(priority_queue, (left_freq + right_freq, parent))
 
-        self.root = priority_queue[0]
-        self.current_node = self.root
+        self.root_id = priority_queue[0][1]
         self._build_code_table()
 
+        # Bei sehr ungleichen Häufigkeiten Codelängen auf _MAX_CODE_LEN begrenzen
+        if max(self.code_len) > _MAX_CODE_LEN:
+            self.code_len = self._limit_code_lengths(freq_dict, _MAX_CODE_LEN)
+
+        # Vom Baum werden nur die Codelängen übernommen, die Codes selbst kanonisch vergeben
+        self._assign_canonical_codes()
+        self._build_tree_from_codes(freq_dict)
+
     def build_from_bytes(self, data: bytes) -> None:
         """
         Berechnet Häufigkeiten aus Byte-Daten und baut den Baum auf.
@@ -73,27 +279,215 @@ class HuffmanTree:
         if not data:
             raise ValueError("Byte-Daten dürfen nicht leer sein")
 
-        freq_dict = {}
-        for byte_value in data:
-            freq_dict[byte_value] = freq_dict.get(byte_value, 0) + 1
+        self.build_from_frequencies(self._count_frequencies(data))
+
+    @staticmethod
+    def _count_frequencies(data: bytes) -> Dict[int, int]:
+        """
+        Zählt die Häufigkeit jedes Byte-Werts.
+
+        Zählt mit collections.Counter, bei größeren Daten und installiertem NumPy
+        mit np.bincount. Beide zählen in C statt Byte für Byte im Interpreter.
+
+        Args:
+            data: Byte-Daten
+
+        Returns:
+            Dictionary mit den vorkommenden Byte-Werten als Keys und Häufigkeiten als Values
+        """
+        if np is None or len(data) < _NUMPY_MIN_SIZE:
+            return dict(Counter(data))
 
-        self.build_from_frequencies(freq_dict)
+        counts = np.bincount(np.frombuffer(data, dtype=np.uint8), minlength=256)
+        return {byte_value: int(count) for byte_value, count in enumerate(counts) if count}
 
     def _build_code_table(self) -> None:
-        """Erstellt die Code-Tabelle durch Baum-Traversierung."""
-        self.code_table = {}
+        """
+        Erstellt die Code-Tabelle durch iterative Baum-Traversierung.
 
-        def traverse(node: Optional[Node], code: str) -> None:
-            if node is None:
-                return
+        Jeder Code wird als Ganzzahl in code_bits und seine Länge in code_len
+        abgelegt (Index = Byte-Wert, Länge 0 = Byte nicht im Baum).
+        """
+        code_bits = [0] * 256
+        code_len = [0] * 256
+        node_sym = self.node_sym
+        stack = [(self.root_id, 0, 0)] if self.root_id >= 0 else []
 
-            if node.is_leaf():
-                self.code_table[node.byte_value] = code if code else "0"
+        while stack:
+            node, bits, length = stack.pop()
+
+            if node_sym[node] >= 0:
+                code_bits[node_sym[node]] = bits
+                code_len[node_sym[node]] = length or 1
             else:
-                traverse(node.left, code + "0")
-                traverse(node.right, code + "1")
+                stack.append((self.node_right[node], (bits << 1) | 1, length + 1))
+                stack.append((self.node_left[node], bits << 1, length + 1))
 
-        traverse(self.root, "")
+        self.code_bits = code_bits
+        self.code_len = code_len
+        self._code_table = None
+        self._code_strings = None
+        self._decode_table = None
+
+    @staticmethod
+    def _limit_code_lengths(freq_dict: Dict[int, int], max_len: int) -> List[int]:
+        """
+        Berechnet optimale Codelängen mit höchstens max_len Bits (Package-Merge).
+
+        Die Blätter werden nach Häufigkeit sortiert. In max_len - 1 Runden werden
+        jeweils zwei benachbarte Einträge zu einem Paket zusammengefasst und die
+        Pakete wieder mit den Blättern zusammengeführt. Von der letzten Liste werden
+        die 2n - 2 leichtesten Einträge gewählt; wie oft ein Byte darin vorkommt,
+        ist seine Codelänge.
+
+        Args:
+            freq_dict: Dictionary mit Byte-Werten als Keys und Häufigkeiten als Values
+            max_len: Maximale Codelänge
+
+        Returns:
+            Codelänge je Byte-Wert (Index = Byte-Wert, 0 = Byte nicht im Baum)
+        """
+        # (Häufigkeit, enthaltene Byte-Werte)
+        leaves = sorted((freq, (byte_value,)) for byte_value, freq in freq_dict.items())
+
+        items = leaves
+        for _ in range(max_len - 1):
+            packages = [
+                (items[i][0] + items[i + 1][0], items[i][1] + items[i + 1][1])
+                for i in range(0, len(items) - 1, 2)
+            ]
+            items = list(heapq.merge(leaves, packages, key=lambda item: item[0]))
+
+        code_len = [0] * 256
+        for _, byte_values in items[:2 * len(leaves) - 2]:
+            for byte_value in byte_values:
+                code_len[byte_value] += 1
+
+        return code_len
+
+    def _assign_canonical_codes(self) -> None:
+        """
+        Ersetzt die Codes durch kanonische Huffman-Codes gleicher Länge.
+
+        Die Bytes werden nach (Codelänge, Byte-Wert) sortiert und erhalten
+        fortlaufende Codes. Damit ist jeder Code allein durch code_len festgelegt.
+        """
+        code_bits = [0] * 256
+        code = 0
+        prev_len = 0
+
+        by_length = sorted((length, byte_value) for byte_value, length in enumerate(self.code_len) if length)
+        for length, byte_value in by_length:
+            code <<= length - prev_len
+            code_bits[byte_value] = code
+            code += 1
+            prev_len = length
+
+        self.code_bits = code_bits
+        self._code_table = None
+        self._code_strings = None
+        self._decode_table = None
+
+    def _make_canonical(self) -> None:
+        """
+        Stellt kanonische Codes mit höchstens _MAX_CODE_LEN Bits sicher.
+
+        Ein Baum aus dem alten Format "HUF\x01" (_deserialize_tree) hat Codes,
+        die sich aus der Baumform ergeben, und kann längere Codes enthalten.
+        Zu lange Codes werden per Package-Merge gekürzt; als Gewicht dient
+        2^-Codelänge, so dass die Längenverteilung möglichst erhalten bleibt.
+        Anschließend werden die Codes kanonisch vergeben und der Baum neu
+        aufgebaut. Die Häufigkeiten der Blätter bleiben erhalten.
+        """
+        code_bits = self.code_bits
+        max_len = max(self.code_len)
+        if max_len > _MAX_CODE_LEN:
+            weights = {byte_value: 1 << (max_len - length) for byte_value, length in enumerate(self.code_len) if length}
+            self.code_len = self._limit_code_lengths(weights, _MAX_CODE_LEN)
+
+        self._assign_canonical_codes()
+        if max_len <= _MAX_CODE_LEN and self.code_bits == code_bits:
+            return
+
+        freq_dict = {
+            self.node_sym[node]: self.node_freq[node]
+            for node in range(len(self.node_sym)) if self.node_sym[node] >= 0
+        }
+        self._build_tree_from_codes(freq_dict)
+
+    def _build_tree_from_codes(self, freq_dict: Optional[Dict[int, int]] = None) -> None:
+        """
+        Baut den Baum passend zu code_bits und code_len neu auf.
+
+        Args:
+            freq_dict: Häufigkeiten der Blätter; innere Knoten erhalten die Summe ihrer Kinder.
+                       Ohne Angabe sind alle Häufigkeiten 0.
+        """
+        freq_dict = freq_dict or {}
+        symbols = [byte_value for byte_value, length in enumerate(self.code_len) if length]
+
+        self._reset_nodes()
+        if len(symbols) == 1:
+            self.root_id = self._alloc_node(freq_dict.get(symbols[0], 0), symbols[0])
+            self.current_id = self.root_id
+            return
+
+        self.root_id = self._alloc_node(0)
+        for byte_value in symbols:
+            bits = self.code_bits[byte_value]
+            node = self.root_id
+            for shift in range(self.code_len[byte_value] - 1, -1, -1):
+                children = self.node_right if (bits >> shift) & 1 else self.node_left
+                if children[node] < 0:
+                    if shift:
+                        children[node] = self._alloc_node(0)
+                    else:
+                        children[node] = self._alloc_node(freq_dict.get(byte_value, 0), byte_value)
+                node = children[node]
+
+        # Kinder haben immer größere IDs als ihre Eltern
+        for node in range(len(self.node_sym) - 1, -1, -1):
+            if self.node_sym[node] < 0:
+                self.node_freq[node] = self.node_freq[self.node_left[node]] + self.node_freq[self.node_right[node]]
+
+        self.current_id = self.root_id
+
+    def _build_decode_table(self) -> Tuple[int, array, array]:
+        """
+        Erstellt die Lookup-Tabelle für den Tabellen-Decoder.
+
+        Die Tabelle wird mit den nächsten k Bits indiziert und liefert Byte-Wert
+        und Codelänge. Codes, die länger als k Bits sind, haben Länge 0 und
+        werden über den Baum decodiert.
+
+        Returns:
+            Tupel (k, sym_table, len_table)
+        """
+        k = min(max(self.code_len), _DECODE_TABLE_BITS)
+        sym_table = array('H', [0]) * (1 << k)
+        len_table = array('B', [0]) * (1 << k)
+
+        for byte_value, length in enumerate(self.code_len):
+            if not length or length > k:
+                continue
+            # Alle Indizes, deren erste `length` Bits dem Code entsprechen
+            start = self.code_bits[byte_value] << (k - length)
+            count = 1 << (k - length)
+            sym_table[start:start + count] = array('H', [byte_value]) * count
+            len_table[start:start + count] = array('B', [length]) * count
+
+        self._decode_table = (k, sym_table, len_table)
+        return self._decode_table
+
+    @property
+    def code_table(self) -> Dict[int, str]:
+        """Code-Tabelle als Bitstrings, wird bei Bedarf aus code_bits und code_len erzeugt."""
+        if self._code_table is None:
+            self._code_table = {
+                byte_value: format(self.code_bits[byte_value], f'0{length}b')
+                for byte_value, length in enumerate(self.code_len) if length
+            }
+        return self._code_table
 
     def encode(self, byte_value: int) -> str:
         """
@@ -122,8 +516,191 @@ class HuffmanTree:
 
         Returns:
             Bitstring als String
+
+        Raises:
+            ValueError: Wenn ein Byte nicht im Baum vorhanden ist
+        """
+        if njit is not None and len(data) >= _JIT_MIN_SIZE:
+            return self._bytes_to_bitstring(*self._encode_to_bytes(data))
+
+        # Ohne JIT bzw. bei kleinen Daten: Bitstrings je Byte-Wert aus einer Tabelle verketten
+        if self._code_strings is None:
+            code_table = self.code_table
+            self._code_strings = [code_table.get(byte_value) for byte_value in range(256)]
+
+        try:
+            return ''.join(map(self._code_strings.__getitem__, data))
+        except TypeError:
+            # Ein Byte ohne Code (None in der Tabelle)
+            self._check_encodable(data)
+            raise
+
+    def _encode_to_bytes(self, data: bytes) -> Tuple[bytes, int]:
+        """
+        Encodiert Byte-Daten direkt in gepackte Bytes, ohne Bitstring als Zwischenschritt.
+
+        Args:
+            data: Zu encodierende Byte-Daten
+
+        Returns:
+            Tupel (codierte_bytes, anzahl_gültiger_bits)
+
+        Raises:
+            ValueError: Wenn ein Byte nicht im Baum vorhanden ist
         """
-        return ''.join(self.encode(byte_value) for byte_value in data)
+        if max(self.code_len) == 1:
+            return self._encode_one_bit_codes(data)
+
+        workers = os.cpu_count() or 1
+        if (njit is not None and workers > 1 and len(data) >= _PARALLEL_MIN_SIZE
+                and max(self.code_len) <= _JIT_MAX_CODE_LEN):
+            return self._encode_parallel(data, workers)
+
+        encoded, buf, nbits = self._encode_chunk(data, 0, 0)
+        return encoded + self._flush_bits(buf, nbits), len(encoded) * 8 + nbits
+
+    def _encode_one_bit_codes(self, data: bytes) -> Tuple[bytes, int]:
+        """
+        Encodiert Daten mit höchstens zwei verschiedenen Bytes, deren Codes genau ein Bit lang sind.
+
+        Bei einem Byte ergibt jedes Eingabe-Byte ein Null-Bit. Bei zwei Bytes wird
+        jedes Byte per translate auf sein Code-Bit ('0' oder '1') abgebildet und gepackt.
+
+        Returns:
+            Tupel (codierte_bytes, anzahl_gültiger_bits)
+        """
+        self._check_encodable(data)
+
+        symbols = bytes(byte_value for byte_value, length in enumerate(self.code_len) if length)
+        if len(symbols) == 1:
+            return bytes((len(data) + 7) // 8), len(data)
+
+        code_chars = bytes(ord('0') + self.code_bits[byte_value] for byte_value in symbols)
+        bits = data.translate(bytes.maketrans(symbols, code_chars))
+        return self._bitstring_to_bytes(bits), len(data)
+
+    def _encode_parallel(self, data: bytes, workers: int) -> Tuple[bytes, int]:
+        """
+        Encodiert große Daten blockweise in mehreren Threads (nur mit Numba).
+
+        Zuerst wird parallel die Bitlänge jedes Blocks bestimmt. Daraus ergibt sich,
+        an welcher Bitposition ein Block im Ergebnis beginnt; er wird mit diesem
+        Versatz encodiert. Beim Zusammensetzen wird dann nur das erste Byte eines
+        Blocks mit dem angebrochenen letzten Byte des Vorgängers verodert.
+        Die Numba-Kernel geben dabei die GIL frei.
+
+        Args:
+            data: Zu encodierende Byte-Daten
+            workers: Anzahl Threads bzw. Blöcke
+
+        Returns:
+            Tupel (codierte_bytes, anzahl_gültiger_bits)
+        """
+        self._check_encodable(data)
+
+        symbols = np.frombuffer(data, dtype=np.uint8)
+        code_bits = np.array(self.code_bits, dtype=np.int64)
+        code_len = np.array(self.code_len, dtype=np.int64)
+        step = -(-len(symbols) // workers)
+        chunks = [symbols[i:i + step] for i in range(0, len(symbols), step)]
+
+        def encode_chunk(chunk, start_bit):
+            # Der Block beginnt mitten in einem Byte: start_bit Null-Bits als Platzhalter
+            out = np.empty((len(chunk) * max(self.code_len) + start_bit) // 8, dtype=np.uint8)
+            nbytes, buf, nbits = _encode_loop(chunk, code_bits, code_len, out, 0, start_bit)
+            return out[:nbytes], int(buf), int(nbits)
+
+        with ThreadPoolExecutor(workers) as pool:
+            bit_counts = list(pool.map(lambda chunk: int(_count_bits(chunk, code_len)), chunks))
+            start_bits = [sum(bit_counts[:i]) % 8 for i in range(len(chunks))]
+            results = list(pool.map(encode_chunk, chunks, start_bits))
+
+        out = bytearray()
+        buf = 0
+        nbits = 0
+        for encoded, chunk_buf, chunk_nbits in results:
+            if len(encoded):
+                out.append(int(encoded[0]) | (buf << (8 - nbits)))
+                out += encoded[1:].tobytes()
+                buf = chunk_buf
+            else:
+                buf = (buf << (chunk_nbits - nbits)) | chunk_buf
+            nbits = chunk_nbits
+
+        num_bits = len(out) * 8 + nbits
+        out += self._flush_bits(buf, nbits)
+        return bytes(out), num_bits
+
+    def _check_encodable(self, data: bytes) -> None:
+        """
+        Prüft, ob alle Bytes in data einen Code haben.
+
+        Raises:
+            ValueError: Wenn ein Byte nicht im Baum vorhanden ist
+        """
+        symbols = bytes(byte_value for byte_value, length in enumerate(self.code_len) if length)
+        missing = data.translate(None, symbols)
+        if missing:
+            raise ValueError(f"Byte {missing[0]} ist nicht im Huffman-Baum enthalten")
+
+    def _encode_chunk(self, data: bytes, buf: int, nbits: int) -> Tuple[bytes, int, int]:
+        """
+        Encodiert einen Block Byte-Daten und gibt nur vollständige Bytes aus.
+
+        Die Codes werden in einem Bit-Puffer gesammelt, der in 64-Bit-Blöcken
+        in ein bytearray geschrieben wird. Bits, die kein volles Byte mehr
+        ergeben, bleiben im Puffer und werden an den nächsten Aufruf übergeben.
+
+        Args:
+            data: Zu encodierende Byte-Daten
+            buf: Noch nicht geschriebene Bits des vorigen Blocks
+            nbits: Anzahl dieser Bits
+
+        Returns:
+            Tupel (codierte_bytes, buf, nbits) mit den verbleibenden Bits
+
+        Raises:
+            ValueError: Wenn ein Byte nicht im Baum vorhanden ist
+        """
+        self._check_encodable(data)
+
+        code_bits = self.code_bits
+        code_len = self.code_len
+
+        if njit is not None and max(code_len) <= _JIT_MAX_CODE_LEN:
+            # Rest-Bits zuerst auf volle Bytes bringen, der Kernel erwartet nbits < 8
+            head = bytearray()
+            while nbits >= 8:
+                nbits -= 8
+                head.append((buf >> nbits) & 0xFF)
+            buf &= (1 << nbits) - 1
+
+            out = np.empty((len(data) * max(code_len) + nbits) // 8, dtype=np.uint8)
+            nbytes, buf, nbits = _encode_loop(
+                np.frombuffer(data, dtype=np.uint8),
+                np.array(code_bits, dtype=np.int64),
+                np.array(code_len, dtype=np.int64),
+                out, buf, nbits,
+            )
+            return bytes(head) + out[:nbytes].tobytes(), int(buf), int(nbits)
+
+        out = bytearray()
+
+        for byte_value in data:
+            buf = (buf << code_len[byte_value]) | code_bits[byte_value]
+            nbits += code_len[byte_value]
+            if nbits >= 64:
+                nbits -= 64
+                out += (buf >> nbits).to_bytes(8, 'big')
+                buf &= (1 << nbits) - 1
+
+        return bytes(out), buf, nbits
+
+    @staticmethod
+    def _flush_bits(buf: int, nbits: int) -> bytes:
+        """Schreibt die restlichen Bits aus dem Bit-Puffer, mit Nullen auf ein volles Byte aufgefüllt."""
+        padding = (8 - nbits % 8) % 8
+        return (buf << padding).to_bytes((nbits + padding) // 8, 'big')
 
     def decode(self, bit: str) -> Tuple[bool, Optional[int]]:
         """
@@ -140,54 +717,160 @@ class HuffmanTree:
         Raises:
             ValueError: Wenn bit nicht '0' oder '1' ist oder Baum nicht initialisiert
         """
-        if bit not in ('0', '1'):
+        # Prüfen und Umwandeln in einem Dictionary-Zugriff
+        go_right = _BIT_VALUES.get(bit)
+        if go_right is None:
             raise ValueError(f"Bit muss '0' oder '1' sein, erhalten: '{bit}'")
 
-        if self.root is None:
+        # current_id ist nur ohne Baum negativ
+        node = self.current_id
+        if node < 0:
             raise ValueError("Baum ist nicht initialisiert")
 
-        if self.current_node is None:
-            self.current_node = self.root
-
-        if self.root.is_leaf():
-            byte_value = self.root.byte_value
-            return (True, byte_value)
-
-        if bit == '0':
-            self.current_node = self.current_node.left
-        else:
-            self.current_node = self.current_node.right
+        node_sym = self.node_sym
+        # Nur ein Blatt als Wurzel (ein einziges Byte) hat keine Kinder
+        if node_sym[node] < 0:
+            node = (self.node_right if go_right else self.node_left)[node]
 
-        if self.current_node.is_leaf():
-            byte_value = self.current_node.byte_value
-            self.current_node = self.root
-            return (True, byte_value)
+        if node_sym[node] >= 0:
+            self.current_id = self.root_id
+            return (True, node_sym[node])
 
+        self.current_id = node
         return (False, None)
 
-    def decode_bytes(self, bitstring: str) -> bytes:
+    def decode_bytes(self, bitstring: Union[str, bytes]) -> bytes:
         """
         Decodiert einen Bitstring zu Byte-Daten.
 
         Args:
-            bitstring: Bitstring als String (z.B. "10110011")
+            bitstring: Bitstring als String (z.B. "10110011") oder als ASCII-Bytes (b"10110011")
 
         Returns:
             Decodierte Byte-Daten
         """
+        # Als ASCII-Bytes weiterverarbeiten: Prüfung und Packen laufen dann ohne str-Objekte je Bit
+        if isinstance(bitstring, str):
+            bitstring = bitstring.encode('ascii', 'replace')
+
+        invalid = bitstring.translate(None, b'01')
+        if invalid:
+            raise ValueError(f"Bit muss '0' oder '1' sein, erhalten: '{chr(invalid[0])}'")
+
         self.reset_decoder()
-        result = []
+        return self._decode_packed(self._bitstring_to_bytes(bitstring), len(bitstring))
 
-        for bit in bitstring:
-            ok, byte_value = self.decode(bit)
-            if ok:
-                result.append(byte_value)
+    def _decode_packed(self, data: bytes, num_bits: int) -> bytes:
+        """
+        Decodiert gepackte Bytes mit dem Tabellen-Decoder.
 
-        return bytes(result)
+        Unvollständige Codes am Ende werden ignoriert.
+
+        Args:
+            data: Codierte Daten
+            num_bits: Anzahl gültiger Bits in data
+
+        Returns:
+            Decodierte Byte-Daten
+        """
+        return self._decode_bits(data, 0, num_bits)[0]
+
+    def _decode_bits(self, data: bytes, start: int, end: int) -> Tuple[bytes, int]:
+        """
+        Decodiert die Bits von start bis end aus gepackten Bytes.
+
+        Statt Bit für Bit durch den Baum zu wandern, werden jeweils k Bits aus
+        einem Bit-Puffer gelesen und in der Lookup-Tabelle nachgeschlagen.
+
+        Args:
+            data: Codierte Daten
+            start: Bitposition des ersten Codes
+            end: Bitposition hinter dem letzten gültigen Bit
+
+        Returns:
+            Tupel (decodierte_bytes, position): position liegt hinter dem letzten
+            vollständigen Code, ein unvollständiger Code am Ende wird nicht decodiert
+        """
+        if self.root_id < 0:
+            raise ValueError("Baum ist nicht initialisiert")
+
+        node_sym = self.node_sym
+        node_left = self.node_left
+        node_right = self.node_right
+        if node_sym[self.root_id] >= 0:
+            return bytes([node_sym[self.root_id]]) * (end - start), end
+
+        if max(self.code_len) == 1:
+            # Zwei Bytes mit je einem Bit als Code: Bits entpacken und per translate abbilden
+            symbols = bytes(byte_value for byte_value, length in enumerate(self.code_len) if length)
+            code_chars = bytes(ord('0') + self.code_bits[byte_value] for byte_value in symbols)
+            bits = self._bytes_to_bitstring(data, end)[start:].encode('ascii')
+            return bits.translate(bytes.maketrans(code_chars, symbols)), end
+
+        k, sym_table, len_table = self._decode_table or self._build_decode_table()
+        mask = (1 << k) - 1
+
+        # Mit Null-Bytes auffüllen, damit am Ende immer 8 Bytes nachgeladen werden können
+        data = bytes(data) + bytes(8)
+
+        if njit is not None:
+            min_len = min(length for length in self.code_len if length)
+            out = np.empty((end - start) // min_len, dtype=np.uint8)
+            count, bitpos = _decode_loop(
+                np.frombuffer(data, dtype=np.uint8), start, end, k,
+                np.frombuffer(sym_table, dtype=np.uint16),
+                np.frombuffer(len_table, dtype=np.uint8),
+                np.frombuffer(node_sym, dtype=np.int16),
+                np.frombuffer(node_left, dtype=np.int32),
+                np.frombuffer(node_right, dtype=np.int32),
+                self.root_id, out,
+            )
+            return out[:count].tobytes(), int(bitpos)
+
+        out = bytearray()
+        pos = start >> 3
+        buf = int.from_bytes(data[pos:pos + 8], 'big')
+        pos += 8
+        nbuf = 64 - (start & 7)
+        bitpos = start
+
+        while bitpos < end:
+            if nbuf < k:
+                buf = ((buf & ((1 << nbuf) - 1)) << 64) | int.from_bytes(data[pos:pos + 8], 'big')
+                pos += 8
+                nbuf += 64
+
+            index = (buf >> (nbuf - k)) & mask
+            length = len_table[index]
+            if length:
+                if bitpos + length > end:
+                    break
+                out.append(sym_table[index])
+                nbuf -= length
+                bitpos += length
+                continue
+
+            # Code länger als k Bits: bitweise durch den Baum
+            node = self.root_id
+            used = 0
+            while bitpos + used < end and node_sym[node] < 0:
+                if not nbuf:
+                    buf = int.from_bytes(data[pos:pos + 8], 'big')
+                    pos += 8
+                    nbuf = 64
+                nbuf -= 1
+                used += 1
+                node = node_right[node] if (buf >> nbuf) & 1 else node_left[node]
+            if node_sym[node] < 0:
+                break
+            out.append(node_sym[node])
+            bitpos += used
+
+        return bytes(out), bitpos
 
     def reset_decoder(self) -> None:
         """Setzt den Decoder-Zustand zurück zur Wurzel."""
-        self.current_node = self.root
+        self.current_id = self.root_id
 
     def get_code_table(self) -> Dict[int, str]:
         """
@@ -199,12 +882,12 @@ class HuffmanTree:
         return self.code_table.copy()
 
     def print_code_table(self) -> None:
-        """Gibt die Code-Tabelle formatiert aus."""
-        print("Huffman-Code-Tabelle:")
-        print("-" * 40)
+        """Gibt die Code-Tabelle formatiert aus (mit einem einzigen Schreibaufruf)."""
+        lines = ["Huffman-Code-Tabelle:", "-" * 40]
         for byte_value, code in sorted(self.code_table.items()):
             char = chr(byte_value) if 32 <= byte_value <= 126 else '?'
-            print(f"Byte {byte_value:3d} ('{char}') -> {code}")
+            lines.append(f"Byte {byte_value:3d} ('{char}') -> {code}")
+        sys.stdout.write("\n".join(lines) + "\n")
 
     def visualize(self, filename: str = "huffman_tree", view: bool = False):
         """
@@ -259,76 +942,101 @@ class HuffmanTree:
 
         return dot
 
-    def _serialize_tree(self) -> str:
+    def _deserialize_tree(self, data: bytes) -> None:
         """
-        Serialisiert den Baum als Bitstring (Pre-Order Traversierung).
+        Baut den Baum aus einem serialisierten Baum des alten Formats "HUF\x01" auf.
 
-        Format:
-        - Innerer Knoten: '0' + rekursiv left + right
-        - Blattknoten: '1' + 8-Bit Byte-Wert
+        Format (Pre-Order Traversierung, Bits gepackt):
+        - Innerer Knoten: Bit 0 + left + right
+        - Blattknoten: Bit 1 + 8-Bit Byte-Wert
 
-        Returns:
-            Bitstring-Repräsentation des Baums
+        Der Baum wird iterativ aufgebaut: Ein Stack hält die inneren Knoten,
+        denen noch ein Kind fehlt. Häufigkeiten sind nicht gespeichert und werden 0.
+        Die Codes ergeben sich aus der Baumform und sind nicht kanonisch.
+
+        Args:
+            data: Serialisierter Baum
+
+        Raises:
+            ValueError: Wenn die Baum-Daten unvollständig sind
         """
-        def serialize_node(node: Optional[Node]) -> str:
-            if node is None:
-                return ''
+        self._reset_nodes()
+        reader = BitReader(data)
+        stack = []
+
+        while True:
+            if reader.read(1):
+                # Blattknoten: nächste 8 Bits sind der Byte-Wert
+                node = self._alloc_node(0, reader.read(8))
+            else:
+                node = self._alloc_node(0)
 
-            if node.is_leaf():
-                # '1' + 8 Bit für Byte-Wert
-                return '1' + format(node.byte_value, '08b')
+            if self.root_id < 0:
+                self.root_id = node
+            elif self.node_left[stack[-1]] < 0:
+                self.node_left[stack[-1]] = node
             else:
-                # '0' + rekursiv left und right
-                return '0' + serialize_node(node.left) + serialize_node(node.right)
+                self.node_right[stack[-1]] = node
+                stack.pop()
 
-        return serialize_node(self.root)
+            if self.node_sym[node] < 0:
+                stack.append(node)
+            if not stack:
+                break
 
-    def _deserialize_tree(self, bitstring: str, pos: int = 0) -> Tuple[Optional[Node], int]:
+        self.current_id = self.root_id
+        self._build_code_table()
+
+    def _load_code_lengths(self, code_len: List[int]) -> None:
         """
-        Deserialisiert einen Baum aus einem Bitstring.
+        Baut Codes und Baum allein aus den Codelängen auf (kanonische Codes).
 
         Args:
-            bitstring: Serialisierter Baum als Bitstring
-            pos: Aktuelle Position im Bitstring
+            code_len: Codelänge je Byte-Wert (0 = Byte nicht im Baum)
 
-        Returns:
-            Tupel (Node, neue_position)
+        Raises:
+            ValueError: Wenn die Codelängen keinen vollständigen Präfix-Code ergeben
         """
-        if pos >= len(bitstring):
-            return None, pos
-
-        if bitstring[pos] == '1':
-            # Blattknoten: nächste 8 Bits sind der Byte-Wert
-            byte_value = int(bitstring[pos+1:pos+9], 2)
-            return Node(0, byte_value), pos + 9
+        lengths = [length for length in code_len if length]
+        if len(lengths) == 1:
+            valid = lengths[0] == 1
         else:
-            # Innerer Knoten: '0' + left + right
-            left, pos = self._deserialize_tree(bitstring, pos + 1)
-            right, pos = self._deserialize_tree(bitstring, pos)
-            return Node(0, left=left, right=right), pos
+            # Kraft-Ungleichung mit Gleichheit: Summe 2^-Länge == 1
+            max_len = max(lengths, default=0)
+            valid = bool(lengths) and sum(1 << (max_len - length) for length in lengths) == 1 << max_len
+        if not valid:
+            raise ValueError("Ungültige Codelängen")
+
+        self.code_len = list(code_len)
+        self._assign_canonical_codes()
+        self._build_tree_from_codes()
 
     @staticmethod
-    def _bitstring_to_bytes(bitstring: str) -> bytes:
+    def _bitstring_to_bytes(bitstring: Union[str, bytes]) -> bytes:
         """
         Konvertiert einen Bitstring in Bytes (mit Padding).
 
         Args:
-            bitstring: String aus '0' und '1'
+            bitstring: String oder ASCII-Bytes aus '0' und '1'
 
         Returns:
             Bytes-Repräsentation
         """
-        # Padding auf nächstes 8er-Vielfaches
-        padding = (8 - len(bitstring) % 8) % 8
-        bitstring_padded = bitstring + '0' * padding
+        if isinstance(bitstring, str):
+            bitstring = bitstring.encode('ascii')
 
-        # In 8er-Gruppen aufteilen und zu Bytes konvertieren
-        byte_array = []
-        for i in range(0, len(bitstring_padded), 8):
-            byte = int(bitstring_padded[i:i+8], 2)
-            byte_array.append(byte)
+        if np is not None:
+            # packbits füllt das letzte Byte selbst mit Nullen auf
+            bits = np.frombuffer(bitstring, dtype=np.uint8) - ord('0')
+            return np.packbits(bits).tobytes()
 
-        return bytes(byte_array)
+        if not bitstring:
+            return b''
+
+        # Padding auf nächstes 8er-Vielfaches, dann in einem Schritt als Zahl parsen
+        padding = (8 - len(bitstring) % 8) % 8
+        num_bytes = (len(bitstring) + padding) // 8
+        return int(bitstring + b'0' * padding, 2).to_bytes(num_bytes, 'big')
 
     @staticmethod
     def _bytes_to_bitstring(data: bytes, num_bits: int) -> str:
@@ -342,133 +1050,295 @@ class HuffmanTree:
         Returns:
             Bitstring
         """
-        bitstring = ''.join(format(byte, '08b') for byte in data)
+        if np is not None:
+            bits = np.unpackbits(np.frombuffer(data, dtype=np.uint8), count=num_bits)
+            return (bits + ord('0')).tobytes().decode('ascii')
+
+        bitstring = format(int.from_bytes(data, 'big'), f'0{len(data) * 8}b')
         return bitstring[:num_bits]
 
-    def compress(self, data: bytes) -> bytes:
+    def compress(self, data: bytes, build_tree: bool = True) -> bytes:
         """
         Komprimiert Byte-Daten mit Huffman-Codierung.
 
         Format:
-        [HEADER: 4 bytes] - "HUF\x01"
-        [TREE_SIZE: 4 bytes] - Länge der Baum-Daten (uint32, big-endian)
-        [TREE_DATA: variable] - Serialisierter Baum
-        [DATA_BITS: 4 bytes] - Anzahl gültiger Bits (uint32, big-endian)
+        [HEADER: 4 bytes] - "HUF\x02"
+        [NUM_SYMBOLS: 1 byte] - Anzahl n der Bytes im Baum - 1
+        [CODE_LENGTHS: variable] - Codelängen (höchstens 15) als 4-Bit-Werte, in der
+                                   kleinsten der drei Darstellungen (ergibt sich aus n):
+                                   - n Byte-Werte + n Codelängen (bis 32 Bytes im Baum)
+                                   - 32 Bytes Bitmap der Byte-Werte + n Codelängen (bis 192)
+                                   - 256 Codelängen (128 Bytes, 0 = nicht im Baum)
+        [DATA_BITS: 8 bytes] - Anzahl gültiger Bits (uint64, big-endian; im Format "HUF\x01" 4 bytes, uint32)
         [DATA: variable] - Codierte Daten
 
+        Da die Codes kanonisch sind, genügen die Codelängen, um den Baum
+        wiederherzustellen. Das ältere Format "HUF\x01" mit serialisiertem Baum
+        kann weiterhin dekomprimiert werden.
+
         Args:
             data: Zu komprimierende Byte-Daten
+            build_tree: Wenn False, wird der vorhandene Baum verwendet (z.B. aus
+                        build_from_frequencies mit bekannter Verteilung). Das spart
+                        den Durchlauf zum Zählen der Häufigkeiten. Nicht kanonische
+                        Codes (Baum aus dem Format "HUF\x01") werden vorher kanonisch
+                        gemacht.
 
         Returns:
             Komprimierte Daten als Bytes
+
+        Raises:
+            ValueError: Wenn build_tree=False ist und der Baum fehlt oder ein Byte nicht enthält
         """
         if not data:
             raise ValueError("Daten dürfen nicht leer sein")
 
         # Baum erstellen
-        self.build_from_bytes(data)
+        if build_tree:
+            self.build_from_bytes(data)
+        elif self.root_id < 0:
+            raise ValueError("Baum ist nicht initialisiert")
+        else:
+            # Der Header enthält nur Codelängen, die Codes müssen also kanonisch sein
+            self._make_canonical()
 
-        # Daten encodieren
-        encoded_bitstring = self.encode_bytes(data)
+        # Daten direkt in Bytes encodieren
+        data_bytes, num_bits = self._encode_to_bytes(data)
 
-        # Baum serialisieren
-        tree_bitstring = self._serialize_tree()
-        tree_bytes = self._bitstring_to_bytes(tree_bitstring)
+        return self._build_header(num_bits) + data_bytes
 
-        # Codierte Daten zu Bytes konvertieren
-        data_bytes = self._bitstring_to_bytes(encoded_bitstring)
+    def _build_header(self, num_bits: int) -> bytes:
+        """
+        Baut alles vor den codierten Daten zusammen: Header, Codelängen und Anzahl Daten-Bits.
+
+        Args:
+            num_bits: Anzahl gültiger Bits der codierten Daten
+
+        Returns:
+            Header-Bytes (Format siehe compress)
+        """
+        symbols = [byte_value for byte_value, length in enumerate(self.code_len) if length]
+        lengths = [self.code_len[byte_value] for byte_value in symbols]
+
+        layout, _ = self._code_lengths_layout(len(symbols))
+        if layout == 'pairs':
+            code_lengths = bytes(symbols) + self._pack_nibbles(lengths)
+        elif layout == 'bitmap':
+            bitmap = bytearray(32)
+            for byte_value in symbols:
+                bitmap[byte_value >> 3] |= 0x80 >> (byte_value & 7)
+            code_lengths = bytes(bitmap) + self._pack_nibbles(lengths)
+        else:
+            code_lengths = self._pack_nibbles(self.code_len)
 
-        # Header zusammenbauen
-        header = b'HUF\x01'
-        tree_size = struct.pack('>I', len(tree_bytes))
-        data_bits = struct.pack('>I', len(encoded_bitstring))
+        header = b'HUF\x02'
+        num_symbols = bytes([len(symbols) - 1])
+        data_bits = struct.pack('>Q', num_bits)
 
-        return header + tree_size + tree_bytes + data_bits + data_bytes
+        return header + num_symbols + code_lengths + data_bits
 
     @staticmethod
-    def decompress(compressed_data: bytes) -> bytes:
+    def _code_lengths_layout(num_symbols: int) -> Tuple[str, int]:
         """
-        Dekomprimiert Huffman-codierte Daten.
+        Wählt die kleinste Darstellung der Codelängen im Header (siehe compress).
 
         Args:
-            compressed_data: Komprimierte Daten
+            num_symbols: Anzahl der Bytes im Baum
 
         Returns:
-            Dekomprimierte Byte-Daten
+            Tupel (Darstellung 'pairs', 'bitmap' oder 'dense', Größe in Bytes)
         """
-        if len(compressed_data) < 16:
-            raise ValueError("Ungültige komprimierte Daten (zu kurz)")
+        nibble_bytes = (num_symbols + 1) // 2
+        sizes = {'pairs': num_symbols + nibble_bytes, 'bitmap': 32 + nibble_bytes, 'dense': 128}
+        layout = min(sizes, key=sizes.get)
+        return layout, sizes[layout]
+
+    @staticmethod
+    def _pack_nibbles(values: List[int]) -> bytes:
+        """Packt Werte von 0 bis 15 paarweise in Bytes (erster Wert im oberen Halbbyte)."""
+        values = list(values) + [0] * (len(values) & 1)
+        return bytes((high << 4) | low for high, low in zip(values[0::2], values[1::2]))
+
+    @staticmethod
+    def _unpack_nibbles(data: bytes, count: int) -> List[int]:
+        """Entpackt count Werte, die mit _pack_nibbles gepackt wurden."""
+        values = [value for byte in data for value in (byte >> 4, byte & 0x0F)]
+        return values[:count]
+
+    @staticmethod
+    def _read_header(f: BinaryIO) -> Tuple['HuffmanTree', int]:
+        """
+        Liest Header und Baum einer komprimierten Datei (Format siehe compress).
+
+        Danach steht f am Anfang der codierten Daten.
+
+        Args:
+            f: Binär geöffnete Datei bzw. Stream
+
+        Returns:
+            Tupel (tree, data_bits)
+        """
+        tree = HuffmanTree()
 
         # Header validieren
-        header = compressed_data[0:4]
-        if header != b'HUF\x01':
+        header = f.read(4)
+        if header == b'HUF\x02':
+            data_bits_format = '>Q'
+
+            # Codelängen lesen, Baum kanonisch wiederherstellen
+            num_symbols_byte = f.read(1)
+            if not num_symbols_byte:
+                raise ValueError("Ungültige komprimierte Daten (zu kurz)")
+            num_symbols = num_symbols_byte[0] + 1
+
+            layout, size = HuffmanTree._code_lengths_layout(num_symbols)
+            code_lengths = f.read(size)
+            if len(code_lengths) < size:
+                raise ValueError("Ungültige komprimierte Daten (zu kurz)")
+
+            code_len = [0] * 256
+            if layout == 'dense':
+                code_len = HuffmanTree._unpack_nibbles(code_lengths, 256)
+            else:
+                if layout == 'pairs':
+                    symbols = list(code_lengths[:num_symbols])
+                    packed = code_lengths[num_symbols:]
+                else:
+                    symbols = [byte_value for byte_value in range(256)
+                               if code_lengths[byte_value >> 3] & (0x80 >> (byte_value & 7))]
+                    packed = code_lengths[32:]
+                if len(set(symbols)) != num_symbols:
+                    raise ValueError("Ungültige Codelängen")
+                for byte_value, length in zip(symbols, HuffmanTree._unpack_nibbles(packed, num_symbols)):
+                    code_len[byte_value] = length
+
+            tree._load_code_lengths(code_len)
+
+        elif header == b'HUF\x01':
+            data_bits_format = '>I'
+
+            # Baum-Größe lesen
+            tree_size_bytes = f.read(4)
+            if len(tree_size_bytes) < 4:
+                raise ValueError("Ungültige komprimierte Daten (zu kurz)")
+            tree_size = struct.unpack('>I', tree_size_bytes)[0]
+
+            # Baum-Daten lesen und deserialisieren
+            tree_bytes = f.read(tree_size)
+            if len(tree_bytes) < tree_size:
+                raise ValueError("Ungültige Baum-Größe")
+            tree._deserialize_tree(tree_bytes)
+
+        else:
             raise ValueError(f"Ungültiger Header: {header}")
 
-        # Baum-Größe lesen
-        tree_size = struct.unpack('>I', compressed_data[4:8])[0]
+        # Daten-Bits-Länge lesen
+        data_bits_size = struct.calcsize(data_bits_format)
+        data_bits_bytes = f.read(data_bits_size)
+        if len(data_bits_bytes) < data_bits_size:
+            raise ValueError("Ungültige komprimierte Daten (zu kurz)")
 
-        # Baum-Daten extrahieren
-        tree_end = 8 + tree_size
-        if tree_end > len(compressed_data):
-            raise ValueError("Ungültige Baum-Größe")
+        return tree, struct.unpack(data_bits_format, data_bits_bytes)[0]
 
-        tree_bytes = compressed_data[8:tree_end]
+    @staticmethod
+    def decompress(compressed_data: bytes) -> bytes:
+        """
+        Dekomprimiert Huffman-codierte Daten.
 
-        # Daten-Bits-Länge lesen
-        data_bits = struct.unpack('>I', compressed_data[tree_end:tree_end+4])[0]
+        Args:
+            compressed_data: Komprimierte Daten
 
-        # Codierte Daten extrahieren
-        data_bytes = compressed_data[tree_end+4:]
+        Returns:
+            Dekomprimierte Byte-Daten
+        """
+        if len(compressed_data) < 12:
+            raise ValueError("Ungültige komprimierte Daten (zu kurz)")
 
-        # Baum deserialisieren
-        tree_bitstring = HuffmanTree._bytes_to_bitstring(tree_bytes, len(tree_bytes) * 8)
-        tree = HuffmanTree()
-        tree.root, _ = tree._deserialize_tree(tree_bitstring)
-        tree.current_node = tree.root
-        tree._build_code_table()
+        stream = io.BytesIO(compressed_data)
+        tree, data_bits = HuffmanTree._read_header(stream)
 
-        # Daten decodieren
-        data_bitstring = HuffmanTree._bytes_to_bitstring(data_bytes, data_bits)
-        decoded_data = tree.decode_bytes(data_bitstring)
+        # Codierte Daten extrahieren
+        data_bytes = compressed_data[stream.tell():]
+        if data_bits > len(data_bytes) * 8:
+            raise ValueError("Ungültige Anzahl Daten-Bits")
 
-        return decoded_data
+        # Daten direkt aus den Bytes decodieren
+        return tree._decode_packed(data_bytes, data_bits)
 
     @staticmethod
     def compress_file(input_file: str, output_file: str) -> None:
         """
         Komprimiert eine Datei.
 
+        Die Datei wird blockweise in zwei Durchläufen gelesen (Häufigkeiten,
+        dann Encoding), sodass sie nie komplett im Speicher liegt.
+
         Args:
             input_file: Pfad zur Eingabedatei
             output_file: Pfad zur Ausgabedatei
         """
+        # 1. Durchlauf: Häufigkeiten blockweise zählen
+        freq = Counter()
         with open(input_file, 'rb') as f:
-            data = f.read()
-
-        tree = HuffmanTree()
-        compressed = tree.compress(data)
+            while chunk := f.read(_CHUNK_SIZE):
+                freq.update(HuffmanTree._count_frequencies(chunk))
 
-        with open(output_file, 'wb') as f:
-            f.write(compressed)
+        if not freq:
+            raise ValueError("Daten dürfen nicht leer sein")
 
-        print(f"Komprimiert: {len(data)} -> {len(compressed)} Bytes")
-        print(f"Kompressionsrate: {len(compressed) / len(data) * 100:.2f}%")
+        tree = HuffmanTree()
+        tree.build_from_frequencies(freq)
+        num_bits = sum(count * tree.code_len[byte_value] for byte_value, count in freq.items())
+
+        # 2. Durchlauf: blockweise encodieren, Rest-Bits an den nächsten Block weitergeben
+        with open(input_file, 'rb') as src, open(output_file, 'wb') as dst:
+            dst.write(tree._build_header(num_bits))
+            buf = 0
+            nbits = 0
+            while chunk := src.read(_CHUNK_SIZE):
+                encoded, buf, nbits = tree._encode_chunk(chunk, buf, nbits)
+                dst.write(encoded)
+            dst.write(tree._flush_bits(buf, nbits))
+            compressed_size = dst.tell()
+
+        original_size = sum(freq.values())
+        print(f"Komprimiert: {original_size} -> {compressed_size} Bytes")
+        print(f"Kompressionsrate: {compressed_size / original_size * 100:.2f}%")
 
     @staticmethod
     def decompress_file(input_file: str, output_file: str) -> None:
         """
         Dekomprimiert eine Datei.
 
+        Die codierten Daten werden blockweise gelesen und decodiert. Ein Code,
+        der über das Blockende hinausgeht, wird mit dem nächsten Block decodiert.
+
         Args:
             input_file: Pfad zur komprimierten Datei
             output_file: Pfad zur Ausgabedatei
         """
-        with open(input_file, 'rb') as f:
-            compressed = f.read()
-
-        decompressed = HuffmanTree.decompress(compressed)
-
-        with open(output_file, 'wb') as f:
-            f.write(decompressed)
-
-        print(f"Dekomprimiert: {len(compressed)} -> {len(decompressed)} Bytes")
+        with open(input_file, 'rb') as src, open(output_file, 'wb') as dst:
+            tree, data_bits = HuffmanTree._read_header(src)
+
+            pending = b''
+            bitpos = 0
+            remaining = data_bits
+            while remaining > 0:
+                chunk = src.read(_CHUNK_SIZE)
+                if not chunk:
+                    raise ValueError("Ungültige Anzahl Daten-Bits")
+
+                # Noch nicht decodierte Bits des vorigen Blocks voranstellen
+                pending = pending[bitpos >> 3:] + chunk
+                bitpos &= 7
+                end = min(bitpos + remaining, len(pending) * 8)
+
+                decoded, next_bitpos = tree._decode_bits(pending, bitpos, end)
+                dst.write(decoded)
+                remaining -= next_bitpos - bitpos
+                bitpos = next_bitpos
+
+            compressed_size = src.tell()
+            decompressed_size = dst.tell()
+
+        print(f"Dekomprimiert: {compressed_size} -> {decompressed_size} Bytes")
@@ -0,0 +1,39 @@
+"""
+Gemeinsamer Einstieg der Skripte, um einen Huffman-Baum zu erhalten.
+"""
+from typing import Dict
+
+from compare_huffman import load_frequencies
+from huffman import HuffmanTree
+
+
+def tree_from_frequencies(freq: Dict[int, int]) -> HuffmanTree:
+    """
+    Baut einen Huffman-Baum aus einem Häufigkeiten-Dictionary auf.
+
+    Jeder Aufruf liefert einen neuen Baum: HuffmanTree ist veränderlich
+    (compress, build_from_*, decode), ein geteiltes Objekt würde Änderungen
+    eines Aufrufers an alle anderen weitergeben.
+
+    Args:
+        freq: Dictionary mit Byte-Werten als Keys und Häufigkeiten als Values
+
+    Returns:
+        Der aufgebaute Huffman-Baum
+    """
+    tree = HuffmanTree()
+    tree.build_from_frequencies(freq)
+    return tree
+
+
+def get_tree(freq_path: str) -> HuffmanTree:
+    """
+    Baut den Huffman-Baum zu einer Häufigkeiten-Datei (JSON) auf.
+
+    Args:
+        freq_path: Pfad der JSON-Datei mit den Häufigkeiten
+
+    Returns:
+        Der aufgebaute Huffman-Baum (bei jedem Aufruf ein neues Objekt)
+    """
+    return tree_from_frequencies(load_frequencies(freq_path))
@@ -1,52 +1,131 @@
-from huffman import HuffmanTree
+from huffman_cache import tree_from_frequencies
+import argparse
 import json
+import mmap
+from collections import Counter
 
-if __name__ == '__main__':
-    # Öffne die Textdatei im Binärmodus ("rb") und lese alle Bytes ein.
-    # Der Binärmodus ist wichtig, um die exakten Byte-Werte zu erhalten.
-    with open("goethe_faust_i.txt", "rb") as f:
-        data = f.read()
+# orjson ist optional: Es schreibt JSON in C und kann Integer-Keys direkt verarbeiten.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# NumPy ist optional: Ohne NumPy wird mit collections.Counter gezählt.
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Numba ist optional: Mit Numba wird die Zählschleife in Maschinencode übersetzt.
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+if njit is not None:
+    # cache=True speichert den übersetzten Code, damit nur der erste Aufruf übersetzen muss.
+    @njit(cache=True)
+    def histogram(buf):
+        # Ein Zähler je Byte-Wert (0-255), als 64-Bit-Ganzzahlen.
+        counts = np.zeros(256, np.int64)
+        # Einfache Schleife über alle Bytes - nach dem Übersetzen ohne Interpreter-Overhead.
+        for i in range(buf.size):
+            counts[buf[i]] += 1
+        return counts
+
+# Blockgröße beim Zählen: Die Datei wird in Blöcken zu 4 MiB durchlaufen (Vielfaches von 4).
+CHUNK_SIZE = 4 << 20
+
+
+def count_frequencies(mm) -> dict[int, int]:
+    """
+    Zählt, wie oft jeder Byte-Wert in der abgebildeten Datei vorkommt.
+
+    Mit Numba über eine übersetzte Schleife, sonst mit np.bincount bzw.
+    ohne NumPy mit collections.Counter, jeweils blockweise (CHUNK_SIZE).
+
+    Args:
+        mm: Mit mmap abgebildete Datei
 
-    # Initialisiere ein leeres Dictionary zur Speicherung der Byte-Häufigkeiten.
+    Returns:
+        Dictionary mit den vorkommenden Byte-Werten als Keys und Häufigkeiten als Values
+    """
+    if np is not None:
+        # Betrachte die abgebildete Datei als NumPy-Array vorzeichenloser 8-Bit-Zahlen (ohne Kopie).
+        arr = np.frombuffer(mm, dtype=np.uint8)
+
+        # Ein Zähler je Byte-Wert (0-255); die Zählungen der einzelnen Blöcke werden hier aufaddiert.
+        counts = np.zeros(256, np.int64)
+
+        # Durchlaufe die Datei blockweise, damit immer nur ein Block gleichzeitig bearbeitet wird.
+        for start in range(0, arr.size, CHUNK_SIZE):
+            if njit is not None:
+                # Mit Numba: Zähle mit der übersetzten Schleife, wie oft jeder Byte-Wert im Block vorkommt.
+                counts += histogram(arr[start:start + CHUNK_SIZE])
+            else:
+                # Zähle mit np.bincount, wie oft jeder Byte-Wert vorkommt - getrennt für jedes vierte Byte.
+                # arr[start::4], arr[start + 1::4], ... (jeweils bis zum Blockende) sind verschränkte Sichten ohne Kopie;
+                # vier getrennte Histogramme vermeiden, dass aufeinanderfolgende gleiche Bytes (z.B. Leerzeichen)
+                # immer denselben Zähler erhöhen.
+                # minlength=256 sorgt dafür, dass jedes Teilergebnis für jeden Byte-Wert (0-255) einen Eintrag hat.
+                # Die vier Histogramme werden anschließend addiert.
+                counts += sum(np.bincount(arr[start + lane:start + CHUNK_SIZE:4], minlength=256) for lane in range(4))
+
+        # Gib das Array frei, sonst kann mmap beim Verlassen des with-Blocks nicht geschlossen werden.
+        del arr
+    else:
+        # Ohne NumPy: Counter zählt die Bytes in C, ebenfalls blockweise.
+        # Iteration über eine memoryview liefert ganze Zahlen (Iteration über mmap dagegen 1-Byte-Objekte).
+        counter = Counter()
+        with memoryview(mm) as view:
+            for start in range(0, len(view), CHUNK_SIZE):
+                counter.update(view[start:start + CHUNK_SIZE])
+
+        # Übertrage die Zählung in eine Liste mit 256 Einträgen (Index = Byte-Wert),
+        # damit beide Zweige dieselbe dichte Tabelle liefern wie np.bincount.
+        counts = [counter[byte_value] for byte_value in range(256)]
+
+    # Dictionary Comprehension: Übernimm nur Byte-Werte, die tatsächlich vorkommen.
+    # Der Huffman-Baum erwartet ein Dictionary; die dichte Tabelle wird erst hier einmal umgewandelt.
     # Schlüssel: Byte-Wert (0-255), Wert: Anzahl des Vorkommens
-    freq = {}
-
-    # Iteriere über jeden Byte-Wert in den eingelesenen Daten.
-    for byte_value in data:
-        # Wenn dieser Byte-Wert noch nicht im Dictionary existiert, initialisiere ihn mit 1.
-        if byte_value not in freq:
-            freq[byte_value] = 1
-        # Ansonsten erhöhe den Zähler um 1.
-        else:
-            freq[byte_value] += 1
-
-    # Schreibe das Häufigkeits-Dictionary als JSON-Datei.
-    # JSON speichert Dictionary-Keys automatisch als Strings, daher werden die Integer-Keys zu Strings konvertiert.
-    with open("frequencies.json", "w", encoding="utf-8") as f:
-        json.dump(freq, f)
+    return {byte_value: int(count) for byte_value, count in enumerate(counts) if count}
 
-    # Lese die JSON-Datei wieder ein.
-    # Das Dictionary freq_str hat nun String-Keys statt Integer-Keys (z.B. "65" statt 65).
-    with open("frequencies.json", "r", encoding="utf-8") as f:
-        freq_str = json.load(f)
 
-    # Dictionary Comprehension: Erzeuge ein neues Dictionary freq_int mit Integer-Keys.
-    # Für jeden Schlüssel in freq_str wird dieser mit int(key) in eine ganze Zahl umgewandelt.
-    # Die Werte (Häufigkeiten) bleiben unverändert.
-    # Dies ist notwendig, weil JSON alle Keys als Strings speichert, der Huffman-Algorithmus aber Integer-Keys erwartet.
-    # Beispiel: {"65": 42} wird zu {65: 42}
-    freq_int = {int(key): freq_str[key] for key in freq_str}
+if __name__ == '__main__':
+    # Lies die Kommandozeilen-Argumente: Mit --verbose wird zusätzlich die Code-Tabelle ausgegeben.
+    # Ohne die Ausgabe der Tabelle misst eine Laufzeitmessung nur Zählen, Baumaufbau und Kodierung.
+    parser = argparse.ArgumentParser(description="Baut einen Huffman-Baum für goethe_faust_i.txt.")
+    parser.add_argument("--verbose", action="store_true", help="Huffman-Code-Tabelle ausgeben")
+    args = parser.parse_args()
 
-    # Erstelle eine neue Instanz des HuffmanTree-Objekts.
-    huffman = HuffmanTree()
+    # Öffne die Textdatei im Binärmodus ("rb") und bilde sie mit mmap in den Speicher ab.
+    # Der Binärmodus ist wichtig, um die exakten Byte-Werte zu erhalten.
+    # Statt die Datei vollständig in ein bytes-Objekt zu kopieren, liest das Betriebssystem
+    # die Seiten der Datei erst beim Zugriff ein (ACCESS_READ: nur lesender Zugriff).
+    with open("goethe_faust_i.txt", "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        # Zähle die Byte-Häufigkeiten.
+        freq = count_frequencies(mm)
+
+    # Schreibe das Häufigkeits-Dictionary als JSON-Datei, damit andere Skripte (z.B. visualize-huffman.py) es laden können.
+    # JSON speichert Dictionary-Keys automatisch als Strings, daher werden die Integer-Keys zu Strings konvertiert.
+    if orjson is not None:
+        # orjson liefert bytes, daher wird die Datei im Binärmodus ("wb") geschrieben.
+        # OPT_NON_STR_KEYS erlaubt Integer-Keys, die beim Schreiben zu Strings werden.
+        with open("frequencies.json", "wb") as f:
+            f.write(orjson.dumps(freq, option=orjson.OPT_NON_STR_KEYS))
+    else:
+        with open("frequencies.json", "w", encoding="utf-8") as f:
+            json.dump(freq, f)
 
-    # Baue den Huffman-Baum basierend auf den Byte-Häufigkeiten auf.
+    # Baue den Huffman-Baum direkt aus den Häufigkeiten im Speicher auf (frequencies.json wird nicht wieder eingelesen).
+    # huffman_cache.tree_from_frequencies baut den Baum für dieselben Häufigkeiten nur einmal pro Prozess auf.
     # Der Algorithmus erstellt eine optimale Präfix-freie Kodierung für die Datenkompression.
-    huffman.build_from_frequencies(freq_int)
+    huffman = tree_from_frequencies(freq)
 
-    # Gebe die generierte Huffman-Codetabelle aus.
+    # Gebe die generierte Huffman-Codetabelle aus, falls --verbose angegeben wurde.
     # Diese zeigt für jeden Byte-Wert die entsprechende binäre Kodierung.
-    huffman.print_code_table()
+    if args.verbose:
+        huffman.print_code_table()
 
     # Definiere einen Test-String als Bytes.
     # "Keller" wird in seine ASCII-Byte-Werte konvertiert.
@@ -1,60 +1,94 @@
-from compare_huffman import load_frequencies
+import itertools
+
 from huffman import HuffmanTree
+from huffman_cache import get_tree
 import graphviz
 
+# Zeichen je Byte-Wert für die Blatt-Beschriftung: druckbares ASCII, sonst '?'.
+# Anführungszeichen und Backslash sind für DOT-Strings bereits maskiert.
+_CHAR = [
+    chr(i).replace('\\', '\\\\').replace('"', '\\"') if 32 <= i <= 126 else '?'
+    for i in range(256)
+]
+
+# Vorlagen für die DOT-Zeilen von Blättern, inneren Knoten und Kanten
+_LEAF_LINE = '\t%s [label="Byte: %d\\n\'%s\'\\nFreq: %d" fillcolor=lightblue]'
+_INNER_LINE = '\t%s [label="Freq: %d" fillcolor=lightgray]'
+_EDGE_LINE = '\t%s -> %s [label=%s]'
+
 
-def visualize_huffman_tree(tree: HuffmanTree, filename: str = "huffman_tree", view: bool = True) -> graphviz.Digraph:
+def build_dot_source(tree: HuffmanTree) -> graphviz.Source:
     """
-    Visualisiert einen Huffman-Baum mit graphviz.
+    Erzeugt den DOT-Quelltext eines Huffman-Baums.
+
+    Der DOT-Quelltext wird als Liste von Zeilen aufgebaut und einmal an
+    graphviz.Source übergeben, statt jeden Knoten und jede Kante einzeln
+    über graphviz.Digraph hinzuzufügen.
 
     Args:
         tree: Der zu visualisierende Huffman-Baum
-        filename: Dateiname für die Ausgabe (ohne Erweiterung)
-        view: Wenn True, wird die Visualisierung automatisch geöffnet
 
     Returns:
-        graphviz.Digraph Objekt
+        graphviz.Source Objekt
     """
-    dot = graphviz.Digraph(comment='Huffman Tree')
-    dot.attr(rankdir='TB')
-    dot.attr('node', shape='circle', style='filled')
+    lines = [
+        '// Huffman Tree',
+        'digraph {',
+        '\trankdir=TB',
+        '\tnode [shape=circle style=filled]',
+    ]
 
-    node_counter = [0]
+    # Iterative Tiefensuche: (Knoten, ID des Elternknotens, Kantenbeschriftung)
+    ids = itertools.count()
+    root = tree.root
+    stack = [(root, None, None)] if root is not None else []
 
-    def add_nodes(node, parent_id=None, edge_label=None):
-        if node is None:
-            return
+    while stack:
+        node, parent_id, edge_label = stack.pop()
 
-        current_id = f"node_{node_counter[0]}"
-        node_counter[0] += 1
+        current_id = f"node_{next(ids)}"
 
         if node.is_leaf():
-            char = chr(node.byte_value) if 32 <= node.byte_value <= 126 else '?'
-            label = f"Byte: {node.byte_value}\n'{char}'\nFreq: {node.freq}"
-            dot.node(current_id, label, fillcolor='lightblue')
+            lines.append(_LEAF_LINE % (current_id, node.byte_value, _CHAR[node.byte_value], node.freq))
         else:
-            label = f"Freq: {node.freq}"
-            dot.node(current_id, label, fillcolor='lightgray')
+            lines.append(_INNER_LINE % (current_id, node.freq))
 
         if parent_id is not None:
-            dot.edge(parent_id, current_id, label=edge_label)
+            lines.append(_EDGE_LINE % (parent_id, current_id, edge_label))
 
         if not node.is_leaf():
-            add_nodes(node.left, current_id, '0')
-            add_nodes(node.right, current_id, '1')
+            # Rechts zuerst ablegen, damit links zuerst besucht wird
+            stack.append((node.right, current_id, '1'))
+            stack.append((node.left, current_id, '0'))
+
+    lines.append('}')
+    return graphviz.Source('\n'.join(lines), engine='dot')
 
-    add_nodes(tree.root)
 
-    dot.render(filename, format='pdf', cleanup=True, view=view)
-    print(f"Visualisierung gespeichert als: {filename}.pdf")
+def visualize_huffman_tree(tree: HuffmanTree, filename: str = "huffman_tree", view: bool = False,
+                          format: str = "svg") -> graphviz.Source:
+    """
+    Visualisiert einen Huffman-Baum mit graphviz.
+
+    Args:
+        tree: Der zu visualisierende Huffman-Baum
+        filename: Dateiname für die Ausgabe (ohne Erweiterung)
+        view: Wenn True, wird die Visualisierung automatisch geöffnet
+        format: Ausgabeformat, z.B. "svg" (Standard, schneller) oder "pdf"
+
+    Returns:
+        graphviz.Source Objekt
+    """
+    dot = build_dot_source(tree)
+
+    dot.render(filename, format=format, cleanup=True, view=view)
+    print(f"Visualisierung gespeichert als: {filename}.{format}")
 
     return dot
 
 
 def main():
-    freq = load_frequencies("frequencies.json")
-    huffman = HuffmanTree()
-    huffman.build_from_frequencies(freq)
+    huffman = get_tree("frequencies.json")
     visualize_huffman_tree(huffman)
 
 if __name__ == "__main__":